@@ -1,13 +1,151 @@
 import os
+import sys
+import errno
 import shutil
 import random
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 from PIL import Image
-import matplotlib.pyplot as plt
 
 
+# ioctl request that clones a file's extents on copy-on-write filesystems (Linux FICLONE)
+_FICLONE = 0x40049409
 
+# os.link errors meaning the filesystem cannot hardlink here: across devices, no hardlink support
+# (SMB/CIFS, FAT/exFAT on macOS, FUSE, FAT32 on Windows), or the source already has the maximum links
+_LINK_FALLBACK_ERRNOS = frozenset({
+    errno.EXDEV, errno.EPERM, errno.EMLINK,
+    errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL,
+})
 
-def split_image_data(source_dir, train_dir, test_dir, train_ratio=0.8):
+
+def _fast_copy(src, dst):
+    """
+    Copies a file with copy_file_range, so copy-on-write filesystems can reflink it instead of duplicating data.
+
+    Raises shutil.SameFileError if `dst` already is `src` (e.g. a hardlink or symlink to it).
+    """
+    # Opening dst for writing would truncate src itself
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30)
+                # Some filesystems (procfs, some FUSE/overlay mounts) report 0 bytes without copying anything
+                done = copied > 0 or os.fstat(fsrc.fileno()).st_size == 0
+                while copied:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30)
+            if done:
+                return
+        except OSError:
+            # Not supported by this kernel or filesystem pair, use the regular copy
+            pass
+    shutil.copyfile(src, dst)
+
+
+def _replace_existing(src, dst, link_mode):
+    """
+    Clears a `dst` left over from an earlier split so it can be recreated.
+
+    Returns True if `dst` already is the requested link to `src` and can be kept as is.
+    """
+    if not os.path.lexists(dst):
+        return False
+
+    is_link = os.path.islink(dst)
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        if link_mode in ('hardlink', 'symlink') and is_link == (link_mode == 'symlink'):
+            return True
+        if not is_link and os.path.realpath(dst) == os.path.realpath(src):
+            # dst is the source entry itself, unlinking it would delete the original
+            raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+    # Only the leftover entry is removed; a hardlink or symlink to src leaves the source intact
+    os.unlink(dst)
+    return False
+
+
+def _transfer_file(src, dst, link_mode):
+    """Places `src` at `dst` by copying, hardlinking, reflinking or symlinking it."""
+    # Deal with leftovers from an earlier split before anything opens dst for writing,
+    # since writing through a hardlink or symlink to src would truncate the source
+    if _replace_existing(src, dst, link_mode):
+        return
+
+    if link_mode == 'hardlink':
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            # Fall back to a plain copy only when the filesystem cannot link, so errors such as
+            # EEXIST or ENOENT still propagate
+            if e.errno not in _LINK_FALLBACK_ERRNOS:
+                raise
+    elif link_mode == 'reflink' and fcntl is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            # Filesystem without reflink support, or source and destination on different filesystems
+            pass
+    elif link_mode == 'symlink':
+        os.symlink(os.path.abspath(src), dst)
+        return
+    _fast_copy(src, dst)
+
+
+def _random_split(items, split_index):
+    """
+    Rearranges `items` in place so that items[:split_index] is a uniformly random subset.
+
+    Only the smaller side of the split is drawn with a partial Fisher-Yates shuffle, so an 80/20
+    split performs 20% of the swaps of a full shuffle.
+    """
+    n = len(items)
+    if split_index <= n - split_index:
+        for i in range(split_index):
+            j = random.randrange(i, n)
+            items[i], items[j] = items[j], items[i]
+    else:
+        for i in range(n - 1, split_index - 1, -1):
+            j = random.randrange(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+
+def _partition_classes(source_dir, train_ratio):
+    """
+    Randomly partitions the files of every class folder in `source_dir` for a train/test split.
+
+    Yields:
+    - tuple: (class_name, class_path, files, split_index) for each non-empty class, where
+      files[:split_index] go to training and the rest to testing.
+    """
+    with os.scandir(source_dir) as class_entries:
+        class_dirs = [(e.name, e.path) for e in class_entries if e.is_dir()]
+
+    for subfolder, subfolder_path in class_dirs:
+        # scandir reports the entry type from the directory listing, no extra stat per file
+        with os.scandir(subfolder_path) as file_entries:
+            files = [e.name for e in file_entries if e.is_file()]
+        total_files = len(files)
+
+        if total_files == 0:
+            print(f"Skipping empty directory: {subfolder_path}")
+            continue
+
+        split_index = int(total_files * train_ratio)
+        _random_split(files, split_index)
+        yield subfolder, subfolder_path, files, split_index
+
+
+def split_image_data(source_dir, train_dir, test_dir, train_ratio=0.8, max_workers=None, link_mode='copy'):
     """
     Splits image data into training and testing datasets based on the given ratio, retaining the original folder.
 
@@ -16,51 +154,197 @@ def split_image_data(source_dir, train_dir, test_dir, train_ratio=0.8):
     - train_dir (str): Path to the directory where training data will be stored.
     - test_dir (str): Path to the directory where testing data will be stored.
     - train_ratio (float): Ratio of data to be used for training (e.g., 0.8 for 80% training and 20% testing).
+    - max_workers (int): Number of threads used to copy files (default is min(32, 4 * CPU count)).
+    - link_mode (str): How files are placed in train_dir/test_dir: 'copy' (default), 'hardlink', 'reflink' or 'symlink'.
 
     Behavior:
     - Each subdirectory in the source directory is treated as a class.
     - Files from each class are randomly shuffled and split into training and testing sets.
     - Subfolders for each class are created in the train_dir and test_dir.
+    - Files from all classes are copied concurrently by a thread pool.
     - Original files remain intact in the source directory.
+    - With 'hardlink', no data is copied; the split files share inodes with the originals, so deleting
+      the originals keeps the training data alive, but editing a file in place changes both. Falls back
+      to copying when source and destination are on different filesystems.
+    - With 'reflink', the split files share data blocks with the originals until either is modified
+      (copy-on-write, e.g. Btrfs or XFS). Falls back to copying where reflinks are not supported.
+    - With 'symlink', the split files point to the originals and break if the source directory is removed.
 
     Example:
         split_image_data('dataset', 'dataset/train', 'dataset/test', 0.8)
     """
+    if link_mode not in ('copy', 'hardlink', 'reflink', 'symlink'):
+        raise ValueError(f"Invalid link_mode: {link_mode}")
+
     os.makedirs(train_dir, exist_ok=True)
     os.makedirs(test_dir, exist_ok=True)
 
-    for subfolder in os.listdir(source_dir):
-        subfolder_path = os.path.join(source_dir, subfolder)
-        if os.path.isdir(subfolder_path):
-            files = os.listdir(subfolder_path)
-            total_files = len(files)
+    copy_pairs = []
+
+    for subfolder, subfolder_path, files, split_index in _partition_classes(source_dir, train_ratio):
+        train_subfolder = os.path.join(train_dir, subfolder)
+        test_subfolder = os.path.join(test_dir, subfolder)
+        # The split roots already exist, so one bare mkdir per class folder is enough
+        for class_dir in (train_subfolder, test_subfolder):
+            try:
+                os.mkdir(class_dir)
+            except FileExistsError:
+                pass
+
+        # Join the directory prefixes once per class rather than once per file
+        src_prefix = subfolder_path + os.sep
+        train_prefix = train_subfolder + os.sep
+        test_prefix = test_subfolder + os.sep
+        # Route each shuffled file by position instead of slicing the list into train/test copies
+        for i, name in enumerate(files):
+            copy_pairs.append((src_prefix + name, (train_prefix if i < split_index else test_prefix) + name))
+
+    # Copying is I/O-bound and releases the GIL, so threads overlap the reads and writes
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda pair: _transfer_file(*pair, link_mode), copy_pairs))
 
-            if total_files == 0:
-                print(f"Skipping empty directory: {subfolder_path}")
+    print("Data split completed.")
+
+
+def split_image_data_manifest(source_dir, out_dir, train_ratio=0.8):
+    """
+    Splits image data into training and testing sets by writing manifest files instead of copying images.
+
+    Parameters:
+    - source_dir (str): Path to the source directory containing subdirectories of images (one subdirectory per class).
+    - out_dir (str): Path to the directory where train.txt and test.txt will be written.
+    - train_ratio (float): Ratio of data to be used for training (e.g., 0.8 for 80% training and 20% testing).
+
+    Behavior:
+    - Files are partitioned per class exactly like split_image_data.
+    - Each line of out_dir/train.txt and out_dir/test.txt is a path relative to source_dir ("class/file"), separated
+      by '/' on every platform.
+    - No image data is read or written, so the split costs one directory scan per class.
+
+    Example:
+        split_image_data_manifest('dataset', 'dataset/splits', 0.8)
+        train_files = tf.data.TextLineDataset('dataset/splits/train.txt')
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(out_dir, "train.txt"), "w", buffering=1 << 20) as train_file, \
+            open(os.path.join(out_dir, "test.txt"), "w", buffering=1 << 20) as test_file:
+        for subfolder, _, files, split_index in _partition_classes(source_dir, train_ratio):
+            # Always '/', so manifests stay portable and match the documented "class/file" format
+            prefix = subfolder + "/"
+            train_file.writelines(prefix + name + "\n" for name in files[:split_index])
+            test_file.writelines(prefix + name + "\n" for name in files[split_index:])
+
+    print("Data split completed.")
+
+
+def split_image_data_mmap(source_dir, out_dir, train_ratio=0.8, batch_size=32):
+    """
+    Splits image data into training and testing sets stored as memory-mapped arrays of decoded images.
+
+    Parameters:
+    - source_dir (str): Path to the source directory containing subdirectories of images (one subdirectory per class).
+    - out_dir (str): Path to the directory where the memory-mapped splits will be stored.
+    - train_ratio (float): Ratio of data to be used for training (e.g., 0.8 for 80% training and 20% testing).
+    - batch_size (int): Number of decoded images buffered before each write to disk (default is 32).
+      Each buffered image is a full-resolution RGB array (about 36 MB for a 12 MP photo), so peak memory
+      grows with batch_size times the largest image size.
+
+    Behavior:
+    - Files are partitioned per class exactly like split_image_data.
+    - Each image is decoded once to an RGB numpy array and written to a `mmap_ninja` RaggedMmap in
+      out_dir/train and out_dir/test, so training reads pixels from the page cache instead of re-decoding files.
+    - Class indices are saved to out_dir/train_labels.npy and out_dir/test_labels.npy, and the class
+      names (in index order) to out_dir/class_names.txt.
+    - Requires the `mmap_ninja` package. Uses more disk space than the original compressed images.
+    - Expects a cleaned dataset (see checks_and_remove_invalid_images). Files that cannot be decoded as
+      images, such as `.DS_Store` or `Thumbs.db`, are skipped with a message and left out of the labels.
+    - A split that ends up without any images is skipped with a message and has no directory or labels
+      file. This happens with train_ratio=1.0 (no test split), or when every class has a single file.
+
+    Example:
+        split_image_data_mmap('dataset', 'dataset_mmap', 0.8)
+        train_images = RaggedMmap('dataset_mmap/train')
+    """
+    import numpy as np
+    from mmap_ninja.ragged import RaggedMmap
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    class_names = []
+    splits = {'train': [], 'test': []}
+
+    for subfolder, subfolder_path, files, split_index in _partition_classes(source_dir, train_ratio):
+        label = len(class_names)
+        class_names.append(subfolder)
+        for i, name in enumerate(files):
+            splits['train' if i < split_index else 'test'].append((os.path.join(subfolder_path, name), label))
+
+    def decode(samples, labels):
+        for p, label in samples:
+            try:
+                with Image.open(p) as im:
+                    image = np.asarray(im.convert('RGB'))
+            except Exception as e:
+                print(f"Skipping undecodable file {p}: {e}")
                 continue
+            # Record the label only for samples that are actually written, keeping both aligned
+            labels.append(label)
+            yield image
 
-            random.shuffle(files)
-            split_index = int(total_files * train_ratio)
-            train_files = files[:split_index]
-            test_files = files[split_index:]
+    for split, samples in splits.items():
+        if not samples:
+            print(f"Skipping empty {split} split: no files were assigned to it.")
+            continue
 
-            train_subfolder = os.path.join(train_dir, subfolder)
-            test_subfolder = os.path.join(test_dir, subfolder)
-            os.makedirs(train_subfolder, exist_ok=True)
-            os.makedirs(test_subfolder, exist_ok=True)
+        split_dir = os.path.join(out_dir, split)
+        labels = []
+        RaggedMmap.from_generator(
+            out_dir=split_dir,
+            sample_generator=decode(samples, labels),
+            batch_size=batch_size,
+            verbose=False,
+        )
+        if not labels:
+            # mmap_ninja only creates an empty directory when the generator yields nothing
+            try:
+                os.rmdir(split_dir)
+            except OSError:
+                pass
+            print(f"Skipping empty {split} split: none of its files could be decoded.")
+            continue
+        np.save(os.path.join(out_dir, f"{split}_labels.npy"), np.asarray(labels, dtype=np.int32))
 
-            for file_name in train_files:
-                shutil.copy(os.path.join(subfolder_path, file_name), os.path.join(train_subfolder, file_name))
-            for file_name in test_files:
-                shutil.copy(os.path.join(subfolder_path, file_name), os.path.join(test_subfolder, file_name))
+    with open(os.path.join(out_dir, "class_names.txt"), "w") as f:
+        f.write("\n".join(class_names) + "\n")
 
     print("Data split completed.")
 
 
-import os
-import random
-from PIL import Image
-import matplotlib.pyplot as plt
+def _load_preview(image_path, size=(512, 512)):
+    """Loads an image downscaled to fit within `size`, which is all a preview subplot needs."""
+    image = Image.open(image_path)
+    # For JPEGs, draft() makes the decoder scale down in the DCT domain instead of decoding full resolution
+    image.draft('RGB', size)
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def _random_entry(path):
+    """Picks a uniformly random file name from a directory in one pass, or None if it has no files."""
+    chosen = None
+    count = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                # Reservoir sampling: keep the n-th file with probability 1/n
+                count += 1
+                if random.randrange(count) == 0:
+                    chosen = entry.name
+    return chosen
+
 
 def show_random_images(data_dir):
     """
@@ -74,16 +358,21 @@ def show_random_images(data_dir):
     - Ignores `.ipynb_checkpoints` and other non-directory files.
     - If the dataset contains more than 5 classes, a random subset of 5 classes is selected.
     - One random image is displayed from each selected class.
+    - Images are decoded concurrently and downscaled to at most 512x512 pixels for display.
     - The images are displayed in a horizontal layout with their class name and file name as titles.
 
     Example:
         show_random_images('path/to/your/dataset')
     """
+    # Plotting libraries are imported on use, so the data helpers load without them
+    import matplotlib.pyplot as plt
+
     # List all valid class directories (exclude '.ipynb_checkpoints')
-    class_names = [
-        d for d in os.listdir(data_dir)
-        if os.path.isdir(os.path.join(data_dir, d)) and d != '.ipynb_checkpoints'
-    ]
+    with os.scandir(data_dir) as entries:
+        class_names = [
+            e.name for e in entries
+            if e.is_dir() and e.name != '.ipynb_checkpoints'
+        ]
 
     if not class_names:
         print("No valid class directories found in the dataset.")
@@ -93,26 +382,35 @@ def show_random_images(data_dir):
     if len(class_names) > 5:
         class_names = random.sample(class_names, 5)
 
-    images = []
-    titles = []
+    samples = []
 
     for class_name in class_names:
         class_path = os.path.join(data_dir, class_name)
-        # Get all files in the class directory
-        files = os.listdir(class_path)
-        if not files:
+        # Randomly select an image file without listing the whole directory into memory
+        image_file = _random_entry(class_path)
+        if image_file is None:
             print(f"Class directory '{class_name}' is empty. Skipping.")
             continue
-        # Randomly select an image file
-        image_file = random.choice(files)
-        image_path = os.path.join(class_path, image_file)
+        samples.append((class_name, image_file, os.path.join(class_path, image_file)))
+
+    def load(sample):
         try:
-            image = Image.open(image_path)
+            return _load_preview(sample[2])
+        except Exception as e:
+            print(f"Error loading image {sample[2]}: {e}")
+            return None
+
+    # Pillow releases the GIL while decoding, so the selected images load in parallel
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        loaded = list(executor.map(load, samples))
+
+    images = []
+    titles = []
+
+    for (class_name, image_file, _), image in zip(samples, loaded):
+        if image is not None:
             images.append(image)
             titles.append(f"Class: {class_name}\nFile: {image_file}")
-        except Exception as e:
-            print(f"Error loading image {image_path}: {e}")
-            continue
 
     if not images:
         print("No images found to display.")
@@ -133,7 +431,142 @@ def show_random_images(data_dir):
     plt.show()
 
 
-def checks_and_remove_invalid_images(base_directory, valid_extensions={".jpg", ".jpeg", ".png", ".gif", ".bmp"}, remove=False):
+# Leading bytes of each supported image format, keyed by file extension
+_MAGIC_NUMBERS = {
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+    ".bmp": (b"BM",),
+    ".tif": (b"II*\x00", b"MM\x00*"),
+    ".tiff": (b"II*\x00", b"MM\x00*"),
+    ".ico": (b"\x00\x00\x01\x00",),
+}
+
+
+_MAGIC_LENGTH = max(len(sig) for signatures in _MAGIC_NUMBERS.values() for sig in signatures)
+
+
+def _magic_signatures(valid_extensions):
+    """Collects the signatures of all valid extensions into one tuple for bytes.startswith."""
+    return tuple({sig for ext in valid_extensions for sig in _MAGIC_NUMBERS.get(ext, ())})
+
+
+# Whether files can be opened and unlinked relative to an open directory descriptor (not on Windows)
+_DIR_FD_SUPPORTED = os.open in os.supports_dir_fd and os.unlink in os.supports_dir_fd
+
+
+def _open_dir(path):
+    """Opens a directory descriptor for dir_fd-relative calls, or returns None where unsupported."""
+    return os.open(path, os.O_RDONLY) if _DIR_FD_SUPPORTED else None
+
+
+def _quick_magic_check(path, signatures, opener=None):
+    """Returns True if the first bytes of the file match one of the given signatures."""
+    with open(path, "rb", opener=opener) as f:
+        # One read and a single C-level prefix test against every signature
+        return f.read(_MAGIC_LENGTH).startswith(signatures)
+
+
+# Number of files handed to a verification worker at a time
+_VERIFY_BATCH_SIZE = 64
+
+# Settings shared by every task of a verification worker, set once by _init_verify_worker
+_verify_options = None
+
+
+def _init_verify_worker(valid_extensions, valid_formats, deep):
+    """Stores the verification settings in a worker process so they are not pickled with every task."""
+    global _verify_options
+    _verify_options = (tuple(valid_extensions), _magic_signatures(valid_extensions), valid_formats, deep)
+
+
+def _verify_batch(args):
+    """
+    Checks a batch of files from one class folder; runs inside a worker process.
+
+    Returns:
+    - list: Names of the invalid files in the batch.
+    """
+    class_folder_path, file_names = args
+
+    # The parent process has already listed the folder; the descriptor only serves to open the batch's
+    # files relative to it, so the kernel resolves one path component per file
+    dir_fd = _open_dir(class_folder_path)
+    try:
+        return _verify_files(class_folder_path, file_names, dir_fd)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def _verify_files(class_folder_path, file_names, dir_fd):
+    """Returns the names of the invalid files among `file_names` in a class folder."""
+    ext_tuple, signatures, valid_formats, deep = _verify_options
+    invalid = []
+
+    def opener(path, flags):
+        return os.open(path, flags, dir_fd=dir_fd)
+
+    # Bind what the loop touches per file to locals, avoiding repeated global lookups
+    magic_numbers = _MAGIC_NUMBERS
+    quick_magic_check = _quick_magic_check
+    # Names are opened relative to dir_fd when available; otherwise prefix the folder path once
+    path_prefix = '' if dir_fd is not None else class_folder_path + os.sep
+
+    for file_name in file_names:
+        file_path = path_prefix + file_name
+        # A single C-level suffix test instead of splitext + set lookup
+        name_lc = file_name.lower()
+
+        if name_lc.endswith(ext_tuple):
+            file_extension = '.' + name_lc.rpartition('.')[2]
+            try:
+                # Reading the header is enough to catch empty, truncated-to-nothing and misnamed files
+                if file_extension in magic_numbers:
+                    if not quick_magic_check(file_path, signatures, opener):
+                        raise ValueError("Unrecognized image header")
+                    if not deep:
+                        continue
+
+                # Open the image with Pillow
+                with open(file_path, "rb", opener=opener) as fp, Image.open(fp) as img:
+                    # Check if the image format is valid
+                    image_format = img.format.lower()
+
+                    if image_format not in valid_formats:
+                        raise ValueError(f"Invalid format: {image_format}")
+
+                    # Image.open has already parsed the header; only a deep check reads the rest of the file
+                    if deep:
+                        # Verify the image's structure
+                        img.verify()  # This checks the file's integrity
+
+            except Exception:
+                # Flag the image as invalid if any step fails
+                invalid.append(file_name)
+        else:
+            # Flag the image as invalid due to format mismatch
+            invalid.append(file_name)
+
+    return invalid
+
+
+def _remove_files(dir_path, names):
+    """Unlinks the named files of one directory, relative to its descriptor where supported."""
+    dir_fd = _open_dir(dir_path)
+    try:
+        for name in names:
+            if dir_fd is None:
+                os.unlink(os.path.join(dir_path, name))
+            else:
+                os.unlink(name, dir_fd=dir_fd)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def checks_and_remove_invalid_images(base_directory, valid_extensions={".jpg", ".jpeg", ".png", ".gif", ".bmp"}, remove=False, max_workers=None, deep=False):
     """
     Iterates through a directory with class folders, checks if images are in valid formats,
     records invalid images, and optionally removes them.
@@ -142,52 +575,75 @@ def checks_and_remove_invalid_images(base_directory, valid_extensions={".jpg", "
     - base_directory (str): Path to the directory containing class folders.
     - valid_extensions (set): Set of valid file extensions (default is common image formats).
     - remove (bool): Whether to remove invalid images (default is False).
+    - max_workers (int): Number of worker processes verifying batches of up to 64 files (default is the CPU count).
+    - deep (bool): Whether to also verify the full structure of every image with Pillow (default is False).
+
+    Behavior:
+    - Files are verified in batches of 64 spread over worker processes, so Pillow decodes run in parallel
+      even when there are only a few classes.
+    - Files with a known extension are checked by their magic bytes only, unless deep is True.
+      Extensions without a known signature have their header parsed by Pillow.
+    - With deep=True, every image is additionally checked with Pillow's verify(), which reads the whole file.
+    - Invalid files are removed in one batch by the calling process once verification is done.
+    - With max_workers=1, or when there is at most one batch, verification runs in the calling process.
+    - Worker processes are spawned on Windows and macOS, so scripts calling this function there must
+      guard their entry point with `if __name__ == '__main__':`.
 
     Returns:
     - list: A list of tuples with invalid image names and their respective class folders.
 
     Example:
-        check_and_remove_invalid_images('dataset', remove=True)
+        if __name__ == '__main__':
+            check_and_remove_invalid_images('dataset', remove=True)
     """
     invalid_images = []
 
     # Normalize valid_extensions to lowercase
-    valid_extensions = {ext.lower() for ext in valid_extensions}
-
-    for class_folder in os.listdir(base_directory):
-        class_folder_path = os.path.join(base_directory, class_folder)
-        
-        if os.path.isdir(class_folder_path):
-            for file_name in os.listdir(class_folder_path):
-                file_path = os.path.join(class_folder_path, file_name)
-                file_extension = os.path.splitext(file_name)[-1].lower()
-
-                if file_extension in valid_extensions:
-                    try:
-                        # Open the image with Pillow
-                        with Image.open(file_path) as img:
-                            # Check if the image format is valid
-                            image_format = img.format.lower()
-                            
-                    
-                            if image_format not in [ext.strip(".") for ext in valid_extensions]:
-                                raise ValueError(f"Invalid format: {image_format}")
-
-                            # Verify the image's structure
-                            img.verify()  # This checks the file's integrity
-
-                    except Exception as e:
-                        # Flag the image as invalid if any step fails
-                        invalid_images.append((file_name, class_folder))
-                        if remove:
-                            os.remove(file_path)
-                            print(f"Removed invalid image: {file_name} in folder {class_folder} - {e}")
-                else:
-                    # Flag the image as invalid due to format mismatch
-                    invalid_images.append((file_name, class_folder))
-                    if remove:
-                        os.remove(file_path)
-                        print(f"Removed invalid format image: {file_name} in folder {class_folder}")
+    valid_extensions = frozenset(ext.lower() for ext in valid_extensions)
+    valid_formats = frozenset(ext.lstrip(".") for ext in valid_extensions)
+
+    with os.scandir(base_directory) as class_entries:
+        class_dirs = [(e.name, e.path) for e in class_entries if e.is_dir()]
+
+    # Batch files per class so workers stay busy regardless of how the classes are sized
+    tasks = []
+    task_classes = []
+    for class_folder, class_folder_path in class_dirs:
+        with os.scandir(class_folder_path) as file_entries:
+            file_names = [e.name for e in file_entries if e.is_file()]
+        for start in range(0, len(file_names), _VERIFY_BATCH_SIZE):
+            tasks.append((class_folder_path, file_names[start:start + _VERIFY_BATCH_SIZE]))
+            task_classes.append(class_folder)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) <= 1:
+        # A pool would only add start-up cost here, so verify in the calling process
+        _init_verify_worker(valid_extensions, valid_formats, deep)
+        results = [_verify_batch(task) for task in tasks]
+    else:
+        # On Linux, forked workers inherit the already imported Pillow instead of re-importing it. Other
+        # platforms keep their default start method (spawn on Windows and macOS, where fork is unsafe)
+        mp_context = multiprocessing.get_context('fork') if sys.platform.startswith('linux') else None
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_verify_worker,
+            initargs=(valid_extensions, valid_formats, deep),
+        ) as executor:
+            results = list(executor.map(_verify_batch, tasks))
+
+    to_remove = []
+    for class_folder, (class_folder_path, _), invalid in zip(task_classes, tasks, results):
+        invalid_images.extend((file_name, class_folder) for file_name in invalid)
+        if invalid:
+            to_remove.append((class_folder_path, invalid))
+
+    # Unlink in a single pass after the read-only scan instead of interleaving it with verification
+    if remove and to_remove:
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(lambda item: _remove_files(*item), to_remove))
+        print(f"Removed {sum(len(names) for _, names in to_remove)} invalid images.")
 
     print("Invalid images found:", invalid_images)
     return invalid_images
@@ -204,21 +660,22 @@ def build_model(model, excluded_layers=0):
 
     Returns:
     - Modified model with layers frozen/trainable as specified.
+
+    Note:
+    - The model is not compiled here, since compiling retraces the training graph. Call `model.compile(...)`
+      once after all trainability changes; changes made after compiling only take effect on the next compile.
     """
     
-    # Freeze all layers initially
-    model.trainable = False  
+    # Freeze all layers at once rather than layer by layer
+    model.trainable = False
 
     if excluded_layers > 0:
         # Make the first `excluded_layers` trainable
-        for i in range(excluded_layers):  # Iterate through the desired layers
-          model.layers[i].trainable = True  # Set them to trainable
-          
-    return model
+        for layer in model.layers[:excluded_layers]:
+            layer.trainable = True
 
-    import matplotlib.pyplot as plt
+    return model
 
-import matplotlib.pyplot as plt
 
 def plot_model_comparison(models, history_list):
     """
@@ -229,6 +686,8 @@ def plot_model_comparison(models, history_list):
         models: A list of model names (strings).
         history_list: A list of model history objects (returned by model.fit).
     """
+    import matplotlib.pyplot as plt
+
     # Set up a 2x2 grid for plots
     fig, axes = plt.subplots(2, 2, figsize=(15, 10))
     axes = axes.ravel()  # Flatten for easy indexing
@@ -252,29 +711,40 @@ def plot_model_comparison(models, history_list):
     plt.show()
 
 
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import confusion_matrix
-
 def plot_confusion_matrix(model, test_data, test_data_dir):
     """Plots a confusion matrix for the given model and test data.
 
     Args:
         model: The trained Keras model.
-        test_data: The test dataset (a `tf.data.Dataset` or `ImageDataGenerator` object).
+        test_data: The test dataset (a `tf.data.Dataset` or `ImageDataGenerator` object), with one-hot
+            or sparse integer labels.
     """
-
-    # Get predictions and true labels
-    y_pred_probs = model.predict(test_data)
-    y_pred = np.argmax(y_pred_probs, axis=1)
-
-    # Get true labels
-    y_true = np.concatenate([y for x, y in test_data], axis=0)
-    y_true = np.argmax(y_true, axis=1)
+    import numpy as np
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import confusion_matrix
+
+    # Get predictions and true labels in one pass, so both come from the same batches in the same order
+    y_pred_parts = []
+    y_true_parts = []
+    if hasattr(test_data, 'prefetch'):
+        import tensorflow as tf
+
+        # Load the next batch while the model is busy with the current one
+        test_data = test_data.prefetch(tf.data.AUTOTUNE)
+    for x, y in test_data:
+        # Reduce each batch to int32 class indices right away instead of keeping N x C one-hot arrays;
+        # calling the model directly skips the callback machinery of predict()
+        y_pred_parts.append(np.argmax(np.asarray(model(x, training=False)), axis=1).astype(np.int32))
+        y = np.asarray(y)
+        # Sparse integer labels are already class indices
+        y_true_parts.append((np.argmax(y, axis=1) if y.ndim > 1 else y).astype(np.int32))
+    y_pred = np.concatenate(y_pred_parts)
+    y_true = np.concatenate(y_true_parts)
 
     # Get class names from the test_data
-    class_names = sorted(next(os.walk(test_data_dir))[1])  # List of folder names, sorted alphabetically
+    with os.scandir(test_data_dir) as entries:
+        class_names = sorted(e.name for e in entries if e.is_dir())  # List of folder names, sorted alphabetically
     
     # Calculate the confusion matrix
     cm = confusion_matrix(y_true, y_pred)